@@ -9,5 +9,6 @@ def init_cache_app(app):
         config={
             "CACHE_TYPE": app.config.get("CACHE_TYPE", "SimpleCache"),
             "CACHE_DEFAULT_TIMEOUT": app.config.get("CACHE_DEFAULT_TIMEOUT", 300),
+            "CACHE_REDIS_URL": app.config.get("CACHE_REDIS_URL"),
         },
     )
@@ -0,0 +1,45 @@
+# Chart rendering, kept out of the blueprint so the chart worker processes
+# only import matplotlib, not the Flask app and its clients
+import os
+import tempfile
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+
+
+def render_chart(ticker, stock_data, image_path):
+    # A standalone Figure bypasses pyplot's global figure registry. It is
+    # thumbnail-sized and quickly compressed: the chart is a preview
+    fig = Figure(figsize=(6, 3), dpi=72)
+    ax = fig.subplots()
+    ax.plot(stock_data.index, stock_data["Close"], label="Close Price")
+    ax.set_title(f"{ticker} Close Price Over Last Year")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Close Price")
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+    # Leave room for the rotated dates without a tight-bbox layout pass
+    fig.subplots_adjust(bottom=0.3)
+
+    # Write to a uniquely named file beside the target and swap it in, so the
+    # chart URL never serves a partial file even when several worker
+    # processes render the same ticker
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(image_path), suffix=".tmp", delete=False
+    ) as tmp_file:
+        try:
+            fig.savefig(
+                tmp_file,
+                format="png",
+                dpi=72,
+                pil_kwargs={"optimize": False, "compress_level": 1},
+            )
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    # NamedTemporaryFile creates the file owner-only; charts are public
+    os.chmod(tmp_file.name, 0o644)
+    os.replace(tmp_file.name, image_path)
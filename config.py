@@ -23,6 +23,7 @@ CONFIG = {
             }
         },
     },
-    "CACHE_TYPE": "SimpleCache",
+    "CACHE_TYPE": os.getenv("CACHE_TYPE", "SimpleCache"),
+    "CACHE_REDIS_URL": os.getenv("CACHE_REDIS_URL"),
     "CACHE_DEFAULT_TIMEOUT": 300,
 }
@@ -1,20 +1,295 @@
+import os
+
+import orjson
+import requests
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from requests.adapters import HTTPAdapter
 import yfinance as yf
-import pandas as pd
-from typing import Dict, Any, Optional
+from yfinance.data import YfData
+import threading
+from concurrent.futures import ALL_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import numpy as np
+import pandas as pd
+
+from cache import cache
+
+# Quotes move intraday while profile fields and filings change rarely
+STOCK_DATA_CACHE_TIMEOUT = 300
+STATIC_DATA_CACHE_TIMEOUT = 86400
+
+QUOTE_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{}"
+TIMESERIES_URL = (
+    "https://query1.finance.yahoo.com/ws/fundamentals-timeseries/v1/finance/"
+    "timeseries/{}"
+)
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+# Symbols per spark request; Yahoo rejects larger batches
+SPARK_BATCH_SIZE = 20
+
+# The quoteSummary modules Ticker.info requests. Ticker.info then makes a
+# second, serial request for trailingPegRatio, which get_stock_data instead
+# fetches concurrently as its own component.
+INFO_MODULES = (
+    "financialData",
+    "quoteType",
+    "defaultKeyStatistics",
+    "assetProfile",
+    "summaryDetail",
+)
+
+# Flat response fields as (response key, info key, default)
+INFO_FIELDS: Tuple[Tuple[str, str, Any], ...] = (
+    ("company_name", "longName", ""),
+    ("currency", "currency", ""),
+    ("ir_website", "irWebsite", ""),
+    ("max_age", "maxAge", 0),
+    ("price_hint", "priceHint", 0),
+    ("previous_close", "previousClose", 0),
+    ("open", "open", 0),
+    ("day_low", "dayLow", 0),
+    ("day_high", "dayHigh", 0),
+    ("regular_market_previous_close", "regularMarketPreviousClose", 0),
+    ("regular_market_open", "regularMarketOpen", 0),
+    ("regular_market_day_low", "regularMarketDayLow", 0),
+    ("regular_market_day_high", "regularMarketDayHigh", 0),
+    ("dividend_rate", "dividendRate", 0),
+    ("dividend_yield", "dividendYield", 0),
+    ("ex_dividend_date", "exDividendDate", 0),
+    ("payout_ratio", "payoutRatio", 0),
+    ("five_year_avg_dividend_yield", "fiveYearAvgDividendYield", 0),
+    ("beta", "beta", 0),
+    ("trailing_pe", "trailingPE", 0),
+    ("forward_pe", "forwardPE", 0),
+    ("volume", "volume", 0),
+    ("regular_market_volume", "regularMarketVolume", 0),
+    ("average_volume", "averageVolume", 0),
+    ("average_volume_10days", "averageVolume10days", 0),
+    ("average_daily_volume_10day", "averageDailyVolume10Day", 0),
+    ("bid", "bid", 0),
+    ("ask", "ask", 0),
+    ("market_cap", "marketCap", 0),
+    ("fifty_two_week_low", "fiftyTwoWeekLow", 0),
+    ("fifty_two_week_high", "fiftyTwoWeekHigh", 0),
+    ("price_to_sales_trailing_12_months", "priceToSalesTrailing12Months", 0),
+    ("fifty_day_average", "fiftyDayAverage", 0),
+    ("two_hundred_day_average", "twoHundredDayAverage", 0),
+    ("trailing_annual_dividend_rate", "trailingAnnualDividendRate", 0),
+    ("trailing_annual_dividend_yield", "trailingAnnualDividendYield", 0),
+    ("enterprise_value", "enterpriseValue", 0),
+    ("profit_margins", "profitMargins", 0),
+    ("float_shares", "floatShares", 0),
+    ("shares_outstanding", "sharesOutstanding", 0),
+    ("held_percent_insiders", "heldPercentInsiders", 0),
+    ("held_percent_institutions", "heldPercentInstitutions", 0),
+    ("implied_shares_outstanding", "impliedSharesOutstanding", 0),
+    ("book_value", "bookValue", 0),
+    ("price_to_book", "priceToBook", 0),
+    ("last_fiscal_year_end", "lastFiscalYearEnd", 0),
+    ("next_fiscal_year_end", "nextFiscalYearEnd", 0),
+    ("most_recent_quarter", "mostRecentQuarter", 0),
+    ("earnings_quarterly_growth", "earningsQuarterlyGrowth", 0),
+    ("net_income_to_common", "netIncomeToCommon", 0),
+    ("trailing_eps", "trailingEps", 0),
+    ("forward_eps", "forwardEps", 0),
+    ("last_split_factor", "lastSplitFactor", ""),
+    ("last_split_date", "lastSplitDate", 0),
+    ("enterprise_to_revenue", "enterpriseToRevenue", 0),
+    ("52_week_change", "52WeekChange", 0),
+    ("sand_p_52_week_change", "SandP52WeekChange", 0),
+    ("lastDividendValue", "lastDividendValue", 0),
+    ("lastDividendDate", "lastDividendDate", 0),
+    ("exchange", "exchange", ""),
+    ("quoteType", "quoteType", ""),
+    ("symbol", "symbol", ""),
+    ("underlyingSymbol", "underlyingSymbol", ""),
+    ("shortName", "shortName", ""),
+    ("longName", "longName", ""),
+    ("firstTradeDateEpochUtc", "firstTradeDateEpochUtc", 0),
+    ("timeZoneFullName", "timeZoneFullName", ""),
+    ("timeZoneShortName", "timeZoneShortName", ""),
+    ("uuid", "uuid", ""),
+    ("messageBoardId", "messageBoardId", ""),
+    ("gmtOffSetMilliseconds", "gmtOffSetMilliseconds", 0),
+    ("currentPrice", "currentPrice", 0),
+    ("targetHighPrice", "targetHighPrice", 0),
+    ("targetLowPrice", "targetLowPrice", 0),
+    ("targetMeanPrice", "targetMeanPrice", 0),
+    ("targetMedianPrice", "targetMedianPrice", 0),
+    ("recommendationMean", "recommendationMean", 0),
+    ("recommendationKey", "recommendationKey", ""),
+    ("numberOfAnalystOpinions", "numberOfAnalystOpinions", 0),
+    ("totalCash", "totalCash", 0),
+    ("totalCashPerShare", "totalCashPerShare", 0),
+    ("totalDebt", "totalDebt", 0),
+    ("totalRevenue", "totalRevenue", 0),
+    ("revenuePerShare", "revenuePerShare", 0),
+    ("returnOnAssets", "returnOnAssets", 0),
+    ("returnOnEquity", "returnOnEquity", 0),
+    ("operatingCashflow", "operatingCashflow", 0),
+    ("earningsGrowth", "earningsGrowth", 0),
+    ("revenueGrowth", "revenueGrowth", 0),
+    ("operatingMargins", "operatingMargins", 0),
+    ("financialCurrency", "financialCurrency", ""),
+    ("trailingPegRatio", "trailingPegRatio", None),
+)
+
+# Defaults for info keys Yahoo leaves out, merged under the fetched info once
+# so fields can be read with plain indexing. Flat field defaults come from
+# INFO_FIELDS; the rest are read by the nested address/contact/company sections
+INFO_DEFAULTS: Dict[str, Any] = {
+    **{source: default for _, source, default in INFO_FIELDS},
+    "address1": "",
+    "address2": "",
+    "city": "",
+    "zip": "",
+    "country": "",
+    "phone": "",
+    "fax": "",
+    "website": "",
+    "industry": "",
+    "sector": "",
+    "longBusinessSummary": "",
+    "companyOfficers": (),
+}
+
+# Intraday info keys refreshed from the latest history bar, as
+# (info keys, history column)
+QUOTE_FIELDS: Tuple[Tuple[Tuple[str, ...], str], ...] = (
+    (("currentPrice",), "Close"),
+    (("open", "regularMarketOpen"), "Open"),
+    (("dayLow", "regularMarketDayLow"), "Low"),
+    (("dayHigh", "regularMarketDayHigh"), "High"),
+    (("volume", "regularMarketVolume"), "Volume"),
+)
+
+# Per-process memo in front of the Yahoo calls so tight polling loops are
+# served from memory instead of tripping Yahoo's throttling
+LOCAL_CACHE_TIMEOUT = 30
+
+
+def _local_cache() -> TTLCache:
+    return TTLCache(maxsize=1024, ttl=LOCAL_CACHE_TIMEOUT)
+
+
+def _stock_key(stock: str, stock_data: Optional[yf.Ticker] = None):
+    return hashkey(stock)
+
+
+# Upper bound on concurrent Yahoo requests per process. The default suits real
+# threads; under gevent workers the pool runs greenlets and should match the
+# worker connection count, or it caps upstream concurrency well below it.
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 16))
+
+# Shared pool for the IO-bound Yahoo requests, sized for several concurrent
+# requests each fanning out into info/history/balance sheet
+executor = ThreadPoolExecutor(
+    max_workers=FETCH_CONCURRENCY, thread_name_prefix="yfinance"
+)
+
+# Fetches currently running, so concurrent requests for the same key share one
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def run_coalesced(key: str, fetch: Callable[[], Any]) -> Any:
+    """Run fetch once per key, letting concurrent callers wait for its result"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        return future.result()
+
+    try:
+        result = fetch()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+# One HTTP session for every Ticker, with a connection pool large enough for
+# the executor so Yahoo connections are kept alive instead of re-handshaked
+session = requests.Session()
+session.mount(
+    "https://", HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_CONCURRENCY)
+)
 
 
 def fetch_stock_data(stock: str) -> yf.Ticker:
     """Fetch stock data"""
-    return yf.Ticker(stock)
+    return yf.Ticker(stock, session=session)
+
+
+def format_dates(index: pd.DatetimeIndex) -> List[str]:
+    """Format a history index as YYYY-MM-DD strings in the exchange's local time"""
+    # Drop the timezone first so dates are not shifted to their UTC day
+    return index.tz_localize(None).values.astype("datetime64[D]").astype(str).tolist()
+
 
+def _fetch_spark(
+    stocks: List[str], period: str
+) -> Dict[str, Optional[Dict[str, List]]]:
+    response = _get_yahoo_json(
+        SPARK_URL, {"symbols": ",".join(stocks), "range": period, "interval": "1d"}
+    )
 
-def get_stock_history(stock: str) -> Dict[str, Any]:
+    closes = {}
+    for stock in stocks:
+        # Unknown symbols are left out of the response
+        result = response.get(stock) or {}
+        points = [
+            (timestamp, close)
+            for timestamp, close in zip(
+                result.get("timestamp") or [], result.get("close") or []
+            )
+            if close is not None
+        ]
+        if not points:
+            closes[stock] = None
+            continue
+
+        timestamps, close = zip(*points)
+        # Spark has no exchange timezone, so sessions are dated by the UTC day
+        # they open on; markets opening before 00:00 UTC land a day early
+        dates = np.array(timestamps, dtype="datetime64[s]").astype("datetime64[D]")
+        closes[stock] = {"dates": dates.astype(str).tolist(), "close": list(close)}
+    return closes
+
+
+def fetch_histories(
+    stocks: List[str], period: str = "1y"
+) -> Dict[str, Optional[Dict[str, List]]]:
+    """Fetch daily closes for several stocks in batched spark requests"""
+    futures = [
+        executor.submit(_fetch_spark, stocks[i : i + SPARK_BATCH_SIZE], period)
+        for i in range(0, len(stocks), SPARK_BATCH_SIZE)
+    ]
+    histories = {}
+    for future in futures:
+        histories.update(future.result())
+    return histories
+
+
+@cached(cache=_local_cache(), key=_stock_key, lock=threading.Lock())
+def get_stock_history(
+    stock: str, stock_data: Optional[yf.Ticker] = None
+) -> Dict[str, Any]:
     """Get stock price history for the last month"""
     try:
-        stock_data = fetch_stock_data(stock)
-        hist = stock_data.history(period="1mo")
-        return {"error": False, "data": hist.to_dict()}
+        if stock_data is None:
+            stock_data = fetch_stock_data(stock)
+        return {"error": False, "data": stock_data.history(period="1mo")}
     except Exception as e:
         return {
             "error": True,
@@ -22,20 +297,101 @@ def get_stock_history(stock: str) -> Dict[str, Any]:
         }
 
 
+def _raw_value(value: Any) -> Any:
+    """Unwrap Yahoo's {"raw": ..., "fmt": ...} values, including nested ones"""
+    if isinstance(value, dict):
+        if "raw" in value:
+            return value["raw"]
+        return {k: _raw_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_raw_value(v) for v in value]
+    if isinstance(value, str):
+        return value.replace("\xa0", " ")
+    return value
+
+
+def _get_yahoo_json(url: str, params: Dict[str, Any]) -> Any:
+    """Get a Yahoo Finance API response through yfinance's shared client"""
+    # YfData handles the cookie and crumb
+    response = YfData(session=session).get(
+        url, user_agent_headers=YfData.user_agent_headers, params=params
+    )
+    if not response.ok:
+        # Not raise_for_status(), whose message includes the URL and its crumb
+        raise requests.HTTPError(
+            f"Yahoo Finance request failed: {response.status_code} {response.reason}"
+        )
+    return orjson.loads(response.content)
+
+
+@cached(cache=_local_cache(), lock=threading.Lock())
+def fetch_stock_info(stock: str) -> Dict[str, Any]:
+    """Fetch stock info flattened from a single quoteSummary request"""
+    result = _get_yahoo_json(
+        QUOTE_SUMMARY_URL.format(stock),
+        {
+            "modules": ",".join(INFO_MODULES),
+            "formatted": "false",
+            "symbol": stock,
+        },
+    )
+    results = result["quoteSummary"]["result"] or []
+
+    info = {}
+    for module in results[0].values() if results else []:
+        if isinstance(module, dict):
+            info.update((k, _raw_value(v)) for k, v in module.items() if v)
+    # Yahoo reports maxAge in days for some modules; match yfinance's seconds
+    if info.get("maxAge") == 1:
+        info["maxAge"] = 86400
+    return info
+
+
+def fetch_trailing_peg_ratio(stock: str) -> Optional[float]:
+    """Fetch the most recent trailing PEG ratio, as Ticker.info does"""
+    now = pd.Timestamp.now("UTC")
+    result = _get_yahoo_json(
+        TIMESERIES_URL.format(stock),
+        {
+            "symbol": stock,
+            "type": "trailingPegRatio",
+            "period1": int((now.floor("D") - pd.Timedelta(days=182)).timestamp()),
+            "period2": int(now.ceil("D").timestamp()),
+        },
+    )
+    series = result["timeseries"]["result"][0].get("trailingPegRatio")
+    return series[-1]["reportedValue"]["raw"] if series else None
+
+
+def get_trailing_peg_ratio(stock: str) -> Dict[str, Any]:
+    """Get the trailing PEG ratio complementing the stock info"""
+    try:
+        return {"error": False, "data": fetch_trailing_peg_ratio(stock)}
+    except Exception as e:
+        return {
+            "error": True,
+            "message": f"Error fetching PEG ratio for {stock}: {str(e)}",
+        }
+
+
 def get_stock_info(stock: str) -> Dict[str, Any]:
     """Get general stock information and metrics"""
     try:
-        stock_data = fetch_stock_data(stock)
-        return {"error": False, "data": stock_data.info}
+        return {"error": False, "data": fetch_stock_info(stock)}
     except Exception as e:
         return {"error": True, "message": f"Error fetching info for {stock}: {str(e)}"}
 
 
-def get_balance_sheet(stock: str) -> Dict[str, Any]:
+@cached(cache=_local_cache(), key=_stock_key, lock=threading.Lock())
+def get_balance_sheet(
+    stock: str, stock_data: Optional[yf.Ticker] = None
+) -> Dict[str, Any]:
     """Get stock balance sheet data"""
     try:
-        stock_data = fetch_stock_data(stock)
-        balance_sheet = stock_data.balance_sheet.fillna(np.nan).replace({np.nan: None})
+        if stock_data is None:
+            stock_data = fetch_stock_data(stock)
+        balance_sheet = stock_data.balance_sheet
+        balance_sheet = balance_sheet.astype(object).where(balance_sheet.notna(), None)
         return {"error": False, "data": balance_sheet.to_dict()}
     except Exception as e:
         return {
@@ -44,228 +400,194 @@ def get_balance_sheet(stock: str) -> Dict[str, Any]:
         }
 
 
+def get_quote_fields(hist: pd.DataFrame) -> Dict[str, Any]:
+    """Get intraday quote fields from the latest bar of price history"""
+    if len(hist) < 2:
+        return {}
+
+    quote = {
+        key: hist[column].iat[-1].item()
+        for keys, column in QUOTE_FIELDS
+        for key in keys
+    }
+    previous_close = hist["Close"].iat[-2].item()
+    quote["previousClose"] = quote["regularMarketPreviousClose"] = previous_close
+    return quote
+
+
+def _fetch_components(ticker: str) -> List[Dict[str, Any]]:
+    """Fetch info, history, balance sheet and PEG ratio, reusing cached components"""
+    # History and balance sheet share a single Ticker
+    stock = fetch_stock_data(ticker)
+    components = (
+        (
+            partial(get_stock_info, ticker),
+            f"stockinfo:{ticker}",
+            STATIC_DATA_CACHE_TIMEOUT,
+        ),
+        (
+            partial(get_stock_history, ticker, stock),
+            f"stockhist:{ticker}:1mo",
+            STOCK_DATA_CACHE_TIMEOUT,
+        ),
+        (
+            partial(get_balance_sheet, ticker, stock),
+            f"stockbalance:{ticker}",
+            STATIC_DATA_CACHE_TIMEOUT,
+        ),
+        (
+            partial(get_trailing_peg_ratio, ticker),
+            f"stockpeg:{ticker}",
+            STATIC_DATA_CACHE_TIMEOUT,
+        ),
+    )
+    results = [cache.get(key) for _, key, _ in components]
+
+    # Fetch the missing components concurrently
+    futures = {
+        index: executor.submit(fetch)
+        for index, (fetch, _, _) in enumerate(components)
+        if results[index] is None
+    }
+    wait(futures.values(), return_when=ALL_COMPLETED)
+
+    for index, future in futures.items():
+        _, key, timeout = components[index]
+        results[index] = future.result()
+        if not results[index]["error"]:
+            cache.set(key, results[index], timeout=timeout)
+
+    return results
+
+
 def get_stock_data(ticker: str) -> Dict[str, Any]:
     """Get comprehensive stock data"""
+    cache_key = f"stockdata:{ticker}"
     try:
-        # Fetch all data components
-        info_result = get_stock_info(ticker)
-        history_result = get_stock_history(ticker)
-        balance_result = get_balance_sheet(ticker)
-
-        if info_result["error"] or history_result["error"] or balance_result["error"]:
-            return {
-                "error": True,
-                "message": "Error fetching some data components",
-                "details": {
-                    "info": info_result.get("message", ""),
-                    "history": history_result.get("message", ""),
-                    "balance": balance_result.get("message", ""),
-                },
-            }
-
-        # Get key data
-        info = info_result["data"]
-        hist = pd.DataFrame(history_result["data"])
-        balance = balance_result["data"]
-
-        # Calculate metrics
-        latest_price = hist["Close"].iloc[-1] if not hist.empty else None
-        price_change = (
-            (hist["Close"].iloc[-1] - hist["Close"].iloc[-2])
-            if not hist.empty
-            else None
-        )
-        price_change_percent = (
-            ((price_change / hist["Close"].iloc[-2]) * 100)
-            if price_change is not None
-            else None
-        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        return run_coalesced(cache_key, lambda: _build_stock_data(ticker))
+
+    except Exception as e:
+        return {
+            "error": True,
+            "message": f"Error analyzing {ticker}: {str(e)}",
+            "ticker": ticker,
+        }
 
-        # Get most recent balance sheet data
-        recent_balance = list(balance.values())[0] if balance else {}
 
+def _build_stock_data(ticker: str) -> Dict[str, Any]:
+    """Build and cache comprehensive stock data from its components"""
+    info_result, history_result, balance_result, peg_result = _fetch_components(ticker)
+
+    if info_result["error"] or history_result["error"] or balance_result["error"]:
         return {
-            "error": False,
-            "data": {
-                "symbol": ticker,
-                "company_name": info.get("longName", ""),
-                "current_price": latest_price,
-                "currency": info.get("currency", ""),
-                "daily_change": {
-                    "value": round(price_change, 2)
-                    if price_change is not None
-                    else None,
-                    "percentage": round(price_change_percent, 2)
+            "error": True,
+            "message": "Error fetching some data components",
+            "details": {
+                "info": info_result.get("message", ""),
+                "history": history_result.get("message", ""),
+                "balance": balance_result.get("message", ""),
+            },
+        }
+
+    # Get key data, with the day-cached info refreshed from recent history
+    hist = history_result["data"]
+    quote_info = {**info_result["data"], **get_quote_fields(hist)}
+    # A missing PEG ratio leaves the field unknown rather than failing
+    if not peg_result["error"]:
+        quote_info["trailingPegRatio"] = peg_result["data"]
+    info = {**INFO_DEFAULTS, **quote_info}
+    balance = balance_result["data"]
+
+    # Calculate metrics on plain floats from the Close array
+    closes = hist["Close"].to_numpy()
+    latest_price = price_change = price_change_percent = None
+    if closes.size:
+        latest_price = float(closes[-1])
+        previous_close = float(closes[-2])
+        price_change = latest_price - previous_close
+        price_change_percent = price_change / previous_close * 100
+
+    # Get most recent balance sheet data
+    recent_balance = list(balance.values())[0] if balance else {}
+
+    result = {
+        "error": False,
+        "data": {
+            "current_price": latest_price,
+            "daily_change": {
+                "value": round(price_change, 2) if price_change is not None else None,
+                "percentage": (
+                    round(price_change_percent, 2)
                     if price_change_percent is not None
-                    else None,
-                },
-                "address": {
-                    "line1": info.get("address1", ""),
-                    "line2": info.get("address2", ""),
-                    "city": info.get("city", ""),
-                    "zip": info.get("zip", ""),
-                    "country": info.get("country", ""),
-                },
-                "contact": {
-                    "phone": info.get("phone", ""),
-                    "fax": info.get("fax", ""),
-                    "website": info.get("website", ""),
-                },
-                "company_info": {
-                    "industry": info.get("industry", ""),
-                    "sector": info.get("sector", ""),
-                    "long_business_summary": info.get("longBusinessSummary", ""),
-                },
-                "officers": [
-                    {
-                        "name": officer.get("name", ""),
-                        "age": officer.get("age", None),
-                        "title": officer.get("title", ""),
-                        "year_born": officer.get("yearBorn", None),
-                        "exercised_value": officer.get("exercisedValue", 0),
-                        "unexercised_value": officer.get("unexercisedValue", 0),
-                    }
-                    for officer in info.get("companyOfficers", [])
-                ],
-                "ir_website": info.get("irWebsite", ""),
-                "max_age": info.get("maxAge", 0),
-                "price_hint": info.get("priceHint", 0),
-                "previous_close": info.get("previousClose", 0),
-                "open": info.get("open", 0),
-                "day_low": info.get("dayLow", 0),
-                "day_high": info.get("dayHigh", 0),
-                "regular_market_previous_close": info.get(
-                    "regularMarketPreviousClose", 0
+                    else None
                 ),
-                "regular_market_open": info.get("regularMarketOpen", 0),
-                "regular_market_day_low": info.get("regularMarketDayLow", 0),
-                "regular_market_day_high": info.get("regularMarketDayHigh", 0),
-                "dividend_rate": info.get("dividendRate", 0),
-                "dividend_yield": info.get("dividendYield", 0),
-                "ex_dividend_date": info.get("exDividendDate", 0),
-                "payout_ratio": info.get("payoutRatio", 0),
-                "five_year_avg_dividend_yield": info.get("fiveYearAvgDividendYield", 0),
-                "beta": info.get("beta", 0),
-                "trailing_pe": info.get("trailingPE", 0),
-                "forward_pe": info.get("forwardPE", 0),
-                "volume": info.get("volume", 0),
-                "regular_market_volume": info.get("regularMarketVolume", 0),
-                "average_volume": info.get("averageVolume", 0),
-                "average_volume_10days": info.get("averageVolume10days", 0),
-                "average_daily_volume_10day": info.get("averageDailyVolume10Day", 0),
-                "bid": info.get("bid", 0),
-                "ask": info.get("ask", 0),
-                "market_cap": info.get("marketCap", 0),
-                "fifty_two_week_low": info.get("fiftyTwoWeekLow", 0),
-                "fifty_two_week_high": info.get("fiftyTwoWeekHigh", 0),
-                "price_to_sales_trailing_12_months": info.get(
-                    "priceToSalesTrailing12Months", 0
+            },
+            "address": {
+                "line1": info["address1"],
+                "line2": info["address2"],
+                "city": info["city"],
+                "zip": info["zip"],
+                "country": info["country"],
+            },
+            "contact": {
+                "phone": info["phone"],
+                "fax": info["fax"],
+                "website": info["website"],
+            },
+            "company_info": {
+                "industry": info["industry"],
+                "sector": info["sector"],
+                "long_business_summary": info["longBusinessSummary"],
+            },
+            "officers": [
+                {
+                    "name": officer.get("name", ""),
+                    "age": officer.get("age", None),
+                    "title": officer.get("title", ""),
+                    "year_born": officer.get("yearBorn", None),
+                    "exercised_value": officer.get("exercisedValue", 0),
+                    "unexercised_value": officer.get("unexercisedValue", 0),
+                }
+                for officer in info["companyOfficers"]
+            ],
+            **{key: info[source] for key, source, _ in INFO_FIELDS},
+            "market_metrics": {
+                "market_cap": quote_info.get("marketCap"),
+                "volume": quote_info.get("volume"),
+                "pe_ratio": quote_info.get("trailingPE"),
+                "forward_pe": quote_info.get("forwardPE"),
+                "price_to_book": quote_info.get("priceToBook"),
+                "dividend_yield": quote_info.get("dividendYield"),
+            },
+            "52_week": {
+                "high": quote_info.get("fiftyTwoWeekHigh"),
+                "low": quote_info.get("fiftyTwoWeekLow"),
+            },
+            "balance_sheet": {
+                "total_assets": recent_balance.get("Total Assets", None),
+                "total_liabilities": recent_balance.get(
+                    "Total Liabilities Net Minority Interest", None
                 ),
-                "fifty_day_average": info.get("fiftyDayAverage", 0),
-                "two_hundred_day_average": info.get("twoHundredDayAverage", 0),
-                "trailing_annual_dividend_rate": info.get(
-                    "trailingAnnualDividendRate", 0
+                "total_equity": recent_balance.get(
+                    "Total Equity Gross Minority Interest", None
                 ),
-                "trailing_annual_dividend_yield": info.get(
-                    "trailingAnnualDividendYield", 0
+                "cash_and_equivalents": recent_balance.get(
+                    "Cash And Cash Equivalents", None
                 ),
-                "currency": info.get("currency", ""),
-                "enterprise_value": info.get("enterpriseValue", 0),
-                "profit_margins": info.get("profitMargins", 0),
-                "float_shares": info.get("floatShares", 0),
-                "shares_outstanding": info.get("sharesOutstanding", 0),
-                "held_percent_insiders": info.get("heldPercentInsiders", 0),
-                "held_percent_institutions": info.get("heldPercentInstitutions", 0),
-                "implied_shares_outstanding": info.get("impliedSharesOutstanding", 0),
-                "book_value": info.get("bookValue", 0),
-                "price_to_book": info.get("priceToBook", 0),
-                "last_fiscal_year_end": info.get("lastFiscalYearEnd", 0),
-                "next_fiscal_year_end": info.get("nextFiscalYearEnd", 0),
-                "most_recent_quarter": info.get("mostRecentQuarter", 0),
-                "earnings_quarterly_growth": info.get("earningsQuarterlyGrowth", 0),
-                "net_income_to_common": info.get("netIncomeToCommon", 0),
-                "trailing_eps": info.get("trailingEps", 0),
-                "forward_eps": info.get("forwardEps", 0),
-                "last_split_factor": info.get("lastSplitFactor", ""),
-                "last_split_date": info.get("lastSplitDate", 0),
-                "enterprise_to_revenue": info.get("enterpriseToRevenue", 0),
-                "52_week_change": info.get("52WeekChange", 0),
-                "sand_p_52_week_change": info.get("SandP52WeekChange", 0),
-                "lastDividendValue": info.get("lastDividendValue", 0),
-                "lastDividendDate": info.get("lastDividendDate", 0),
-                "exchange": info.get("exchange", ""),
-                "quoteType": info.get("quoteType", ""),
-                "symbol": info.get("symbol", ""),
-                "underlyingSymbol": info.get("underlyingSymbol", ""),
-                "shortName": info.get("shortName", ""),
-                "longName": info.get("longName", ""),
-                "firstTradeDateEpochUtc": info.get("firstTradeDateEpochUtc", 0),
-                "timeZoneFullName": info.get("timeZoneFullName", ""),
-                "timeZoneShortName": info.get("timeZoneShortName", ""),
-                "uuid": info.get("uuid", ""),
-                "messageBoardId": info.get("messageBoardId", ""),
-                "gmtOffSetMilliseconds": info.get("gmtOffSetMilliseconds", 0),
-                "currentPrice": info.get("currentPrice", 0),
-                "targetHighPrice": info.get("targetHighPrice", 0),
-                "targetLowPrice": info.get("targetLowPrice", 0),
-                "targetMeanPrice": info.get("targetMeanPrice", 0),
-                "targetMedianPrice": info.get("targetMedianPrice", 0),
-                "recommendationMean": info.get("recommendationMean", 0),
-                "recommendationKey": info.get("recommendationKey", ""),
-                "numberOfAnalystOpinions": info.get("numberOfAnalystOpinions", 0),
-                "totalCash": info.get("totalCash", 0),
-                "totalCashPerShare": info.get("totalCashPerShare", 0),
-                "totalDebt": info.get("totalDebt", 0),
-                "totalRevenue": info.get("totalRevenue", 0),
-                "revenuePerShare": info.get("revenuePerShare", 0),
-                "returnOnAssets": info.get("returnOnAssets", 0),
-                "returnOnEquity": info.get("returnOnEquity", 0),
-                "operatingCashflow": info.get("operatingCashflow", 0),
-                "earningsGrowth": info.get("earningsGrowth", 0),
-                "revenueGrowth": info.get("revenueGrowth", 0),
-                "operatingMargins": info.get("operatingMargins", 0),
-                "financialCurrency": info.get("financialCurrency", ""),
-                "trailingPegRatio": info.get("trailingPegRatio", 0),
-                "market_metrics": {
-                    "market_cap": info.get("marketCap", None),
-                    "volume": info.get("volume", None),
-                    "pe_ratio": info.get("trailingPE", None),
-                    "forward_pe": info.get("forwardPE", None),
-                    "price_to_book": info.get("priceToBook", None),
-                    "dividend_yield": info.get("dividendYield", None),
-                },
-                "52_week": {
-                    "high": info.get("fiftyTwoWeekHigh", None),
-                    "low": info.get("fiftyTwoWeekLow", None),
-                },
-                "balance_sheet": {
-                    "total_assets": recent_balance.get("Total Assets", None),
-                    "total_liabilities": recent_balance.get(
-                        "Total Liabilities Net Minority Interest", None
-                    ),
-                    "total_equity": recent_balance.get(
-                        "Total Equity Gross Minority Interest", None
-                    ),
-                    "cash_and_equivalents": recent_balance.get(
-                        "Cash And Cash Equivalents", None
-                    ),
-                },
-                "historical_data": {
-                    "dates": hist.index.strftime("%Y-%m-%d").tolist()
-                    if not hist.empty
-                    else [],
-                    "prices": hist["Close"].round(2).tolist() if not hist.empty else [],
-                    "volumes": hist["Volume"].tolist() if not hist.empty else [],
-                },
             },
-        }
-
-    except Exception as e:
-        return {
-            "error": True,
-            "message": f"Error analyzing {ticker}: {str(e)}",
-            "ticker": ticker,
-        }
+            "historical_data": {
+                "dates": format_dates(hist.index) if not hist.empty else [],
+                "prices": np.round(closes, 2).tolist(),
+                "volumes": hist["Volume"].to_numpy().tolist(),
+            },
+        },
+    }
+    cache.set(f"stockdata:{ticker}", result, timeout=STOCK_DATA_CACHE_TIMEOUT)
+    return result
 
 
 def format_analysis_for_chat(stock_data: Dict[str, Any]) -> str:
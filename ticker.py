@@ -1,18 +1,94 @@
 from flask_smorest import Blueprint
-from flask import jsonify, request
+from flask import Response, jsonify, request
 from auth import auth
 from cache import cache
 from rate_limiter import limiter
-import yfinance as yf
+from helpers import (
+    STOCK_DATA_CACHE_TIMEOUT,
+    executor,
+    fetch_histories,
+    fetch_stock_data,
+    fetch_stock_info,
+    format_dates,
+    run_coalesced,
+)
+import orjson
 import os
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from charts import render_chart
 
 
 bp = Blueprint("ticker", "items", description="Operations on ticker endpoint")
 
+STATIC_FOLDER = "static"
+os.makedirs(STATIC_FOLDER, exist_ok=True)
+
+# Upper bound on symbols per /tickers request, each one being a Yahoo call
+MAX_TICKERS = 20
+
+# Rendered charts are reused until they are this old, in seconds
+CHART_MAX_AGE = 3600
+
+# Charts render in the background so responses do not wait on savefig. They
+# run in separate processes because under gevent workers threads are
+# greenlets, and a CPU-bound render would stall every connection's event loop.
+# Spawned children import only the charts module, not a fork of the server.
+plot_pool = ProcessPoolExecutor(
+    max_workers=2, mp_context=multiprocessing.get_context("spawn")
+)
+_rendering = set()
+_rendering_lock = threading.Lock()
+
+
+def json_response(payload):
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype="application/json",
+    )
+
+
+def chart_is_fresh(image_path):
+    try:
+        return time.time() - os.path.getmtime(image_path) < CHART_MAX_AGE
+    except OSError:
+        return False
+
+
+def schedule_chart(ticker, stock_data, image_path):
+    """Render the chart in the background unless a render is already queued"""
+    with _rendering_lock:
+        if image_path in _rendering:
+            return
+        _rendering.add(image_path)
+
+    def on_rendered(future):
+        with _rendering_lock:
+            _rendering.discard(image_path)
+        if future.exception() is not None:
+            print(f"Chart render error for {ticker}: {str(future.exception())}")
+
+    try:
+        future = plot_pool.submit(
+            render_chart, ticker, stock_data[["Close"]], image_path
+        )
+    except Exception as e:
+        with _rendering_lock:
+            _rendering.discard(image_path)
+        print(f"Chart render error for {ticker}: {str(e)}")
+        return
+    future.add_done_callback(on_rendered)
+
+
+def fetch_ticker(ticker):
+    stock = fetch_stock_data(ticker)
+    # Request history on the shared pool while this thread waits on info, so
+    # the request is held for the slower of the two calls rather than both
+    history = executor.submit(stock.history, period="1y")
+    return fetch_stock_info(ticker), history.result()
+
 
 @bp.route("/ticker", methods=["POST"])
 @auth.login_required()
@@ -21,11 +97,17 @@ def ticker():
         input_data = request.get_json()
         ticker = input_data["ticker"]
 
-        try:
-            stock = yf.Ticker(ticker)
+        cache_key = f"ticker_resp:{ticker}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return json_response(cached), 200
 
-            # Get stock info
-            stock_info = stock.info
+        try:
+            # Get stock info and historical data, shared with concurrent
+            # requests for the same ticker
+            stock_info, stock_data = run_coalesced(
+                f"ticker:{ticker}", lambda: fetch_ticker(ticker)
+            )
 
             # Basic validation - hanya cek apakah ada data dasar
             if not stock_info:
@@ -39,8 +121,6 @@ def ticker():
                     }
                 ), 404
 
-            # Get historical data
-            stock_data = stock.history(period="1y")
             if stock_data.empty:
                 return jsonify(
                     {
@@ -53,21 +133,9 @@ def ticker():
                 ), 404
 
             # Create plot
-            static_folder = "static"
-            if not os.path.exists(static_folder):
-                os.makedirs(static_folder)
-
-            plt.figure(figsize=(10, 8))
-            plt.plot(stock_data.index, stock_data["Close"], label="Close Price")
-            plt.title(f"{ticker} Close Price Over Last Year")
-            plt.xlabel("Date")
-            plt.ylabel("Close Price")
-            plt.legend()
-            plt.xticks(rotation=45)
-
-            image_path = os.path.join(static_folder, f"{ticker}_close_price.png")
-            plt.savefig(image_path)
-            plt.close()
+            image_path = os.path.join(STATIC_FOLDER, f"{ticker}_close_price.png")
+            if not chart_is_fresh(image_path):
+                schedule_chart(ticker, stock_data, image_path)
 
             # Prepare response with more flexible field handling
             response = {
@@ -108,13 +176,15 @@ def ticker():
                         ),
                         "chart_url": f"{request.host_url}{image_path}",
                     },
-                    "stock_data": stock_data[["Close"]]
-                    .reset_index()
-                    .to_dict(orient="records"),
+                    "stock_data": {
+                        "dates": format_dates(stock_data.index),
+                        "close": stock_data["Close"].to_numpy().tolist(),
+                    },
                 },
             }
 
-            return jsonify(response), 200
+            cache.set(cache_key, response, timeout=STOCK_DATA_CACHE_TIMEOUT)
+            return json_response(response), 200
 
         except Exception as e:
             error_message = str(e)
@@ -130,3 +200,52 @@ def ticker():
     return jsonify(
         {"status": {"code": 405, "message": "Invalid request method"}, "data": None}
     ), 405
+
+
+@bp.route("/tickers", methods=["POST"])
+@auth.login_required()
+def tickers():
+    input_data = request.get_json(silent=True)
+    symbols = input_data.get("tickers") if isinstance(input_data, dict) else None
+
+    if (
+        not symbols
+        or not isinstance(symbols, list)
+        or not all(isinstance(symbol, str) and symbol for symbol in symbols)
+    ):
+        return jsonify(
+            {
+                "status": {"code": 400, "message": "A list of tickers is required"},
+                "data": None,
+            }
+        ), 400
+
+    # Yahoo symbols are case-insensitive, so collapse "aapl" and "AAPL"
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    if len(symbols) > MAX_TICKERS:
+        return jsonify(
+            {
+                "status": {
+                    "code": 400,
+                    "message": f"At most {MAX_TICKERS} tickers per request",
+                },
+                "data": None,
+            }
+        ), 400
+
+    try:
+        data = fetch_histories(symbols, period="1y")
+    except Exception as e:
+        return jsonify(
+            {
+                "status": {
+                    "code": 500,
+                    "message": f"Error fetching tickers: {str(e)}",
+                },
+                "data": None,
+            }
+        ), 500
+
+    return json_response(
+        {"status": {"code": 200, "message": "Success"}, "data": data}
+    ), 200